@@ -1,6 +1,7 @@
 from flask import Flask
 from flask_cors import CORS
 
+from app.leaderboard_ranks import init_rank_flush_queue
 from app.swagger import init_swagger
 
 from .config import Config
@@ -17,6 +18,7 @@ def create_app(config_class=Config) -> Flask:
 
     db.init_app(app)
     migrate.init_app(app, db)
+    init_rank_flush_queue(app)
 
     from app.models.user import User
     from app.models.auth.auth_provider import AuthProviderEnum, AuthProvider
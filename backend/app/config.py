@@ -1,8 +1,11 @@
 import os
 from datetime import timedelta
-from dotenv import load_dotenv
 
-load_dotenv()
+# Production injects its environment directly; only local runs read .env
+if os.getenv("FLASK_ENV", "development") != "production":
+    from dotenv import load_dotenv
+
+    load_dotenv()
 
 
 class Config:
@@ -18,6 +21,10 @@ class Config:
         "DATABASE_URL", "sqlite:///instance/app.db"
     )
     SQLALCHEMY_TRACK_MODIFICATIONS: bool = False
+    SQLALCHEMY_ENGINE_OPTIONS: dict = {
+        # Room for every distinct statement the services issue (default is 500)
+        "query_cache_size": 1200,
+    }
 
     # CORS
     CORS_ORIGINS: list[str] = os.getenv("CORS_ORIGINS", "*").split(",")
@@ -39,8 +46,12 @@ class Config:
     OTP_MAX_ATTEMPTS: int = 5
 
     MAX_LOGIN_ATTEMPTS: int = 5
+    PASSWORD_VERIFY_TIMEOUT_SECONDS: int = 2
     ACCOUNT_LOCK_MINUTES: int = 30
 
+    # Seconds between background leaderboard rank recalculations
+    LEADERBOARD_RANK_FLUSH_SECONDS: int = 5
+
     DEFAULT_PAGE_SIZE: int = 10
     MAX_PAGE_SIZE: int = 100
 
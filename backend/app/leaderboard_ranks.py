@@ -0,0 +1,82 @@
+import atexit
+import threading
+import time
+import uuid
+
+from datetime import datetime
+from typing import Optional, cast
+
+from flask import Flask, current_app
+
+_EXTENSION_KEY = "leaderboard_rank_queue"
+
+
+class RankFlushQueue:
+    """
+    Leaderboard periods whose ranks are stale, owned by one app
+
+    A background thread recalculates them every LEADERBOARD_RANK_FLUSH_SECONDS,
+    and whatever is still pending is flushed at interpreter exit. The thread is
+    started on first use, so forked workers each run their own.
+    """
+
+    def __init__(self, app: Flask):
+        self._app = app
+        self._interval = app.config["LEADERBOARD_RANK_FLUSH_SECONDS"]
+        self._pending: set[tuple[uuid.UUID, datetime]] = set()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+        atexit.register(self.flush)
+
+    def add(self, leaderboard_id: uuid.UUID, period_start: datetime) -> None:
+        """Queue a period and make sure this app's flusher is running"""
+        with self._lock:
+            self._pending.add((leaderboard_id, period_start))
+
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="leaderboard-rank-flusher", daemon=True
+                )
+                self._thread.start()
+
+    def requeue(self, leaderboard_id: uuid.UUID, period_start: datetime) -> None:
+        """Put back a period whose recalculation failed"""
+        with self._lock:
+            self._pending.add((leaderboard_id, period_start))
+
+    def drain(self) -> list[tuple[uuid.UUID, datetime]]:
+        """Take every pending period off the queue"""
+        with self._lock:
+            pending = list(self._pending)
+            self._pending.clear()
+        return pending
+
+    def flush(self) -> None:
+        """Recalculate every pending period now, in this app's context"""
+        if not self._pending:
+            return
+
+        # Imported here: the game models can't be imported while create_app runs
+        from app.services.leaderboard_service import LeaderboardService
+
+        with self._app.app_context():
+            try:
+                LeaderboardService.flush_dirty_ranks()
+            except Exception:
+                self._app.logger.exception("Failed to recalculate leaderboard ranks")
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self._interval)
+            self.flush()
+
+
+def init_rank_flush_queue(app: Flask) -> None:
+    """Give the app its own queue of leaderboard periods to re-rank"""
+    app.extensions[_EXTENSION_KEY] = RankFlushQueue(app)
+
+
+def rank_flush_queue() -> RankFlushQueue:
+    """The current app's rank flush queue"""
+    return cast(RankFlushQueue, current_app.extensions[_EXTENSION_KEY])
@@ -68,7 +68,8 @@ class OTPCode(db.Model):
             db.session.commit()
             return False
 
-        if self.code == code:
+        # Constant-time comparison so response timing doesn't leak matching digits
+        if secrets.compare_digest(self.code.encode(), str(code).encode()):
             self.is_used = True
             db.session.commit()
             return True
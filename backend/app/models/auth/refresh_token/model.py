@@ -46,6 +46,16 @@ class RefreshToken(db.Model):
         self.is_revoked = True
         db.session.commit()
 
+    @staticmethod
+    def revoke_all_for_user(user_id: uuid.UUID) -> int:
+        """Revoke every active token for a user in one UPDATE (caller commits)"""
+        return int(
+            RefreshToken.query.filter(
+                RefreshToken.user_id == user_id,
+                RefreshToken.is_revoked.is_(False),
+            ).update({RefreshToken.is_revoked: True}, synchronize_session=False)
+        )
+
     @staticmethod
     def verify_and_get_user(token):
         """Verify refresh token and return user"""
@@ -55,6 +55,12 @@ class LeaderboardEntry(db.Model):
 
     __table_args__ = (
         Index("idx_leaderboard_rank", "leaderboard_id", "rank"),
+        Index(
+            "idx_leaderboard_period_score",
+            "leaderboard_id",
+            "period_start",
+            "score_value",
+        ),
         Index("idx_user_leaderboard", "user_id", "leaderboard_id"),
         UniqueConstraint(
             "leaderboard_id",
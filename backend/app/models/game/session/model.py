@@ -1,5 +1,5 @@
 from datetime import datetime, timezone
-from typing import Any
+from typing import Any, Optional
 import uuid
 import enum
 
@@ -58,18 +58,21 @@ class GameSession(db.Model):
     game: Mapped[Game] = relationship("Game", back_populates="sessions")
     user: Mapped[User] = relationship("User", backref="game_sessions")
 
-    __table_args__ = (Index("idx_user_game_sessions", "user_id", "game_id"),)
+    __table_args__ = (
+        # Session history: filter by user/game/status, newest first
+        Index("idx_user_sessions_recent", "user_id", "game_id", "status", "started_at"),
+    )
 
     def __init__(
         self,
         game_id: uuid.UUID,
         user_id: uuid.UUID,
         status: GameSessionStatusEnum,
-        game_state: dict[str, Any] = {},
+        game_state: Optional[dict[str, Any]] = None,
     ):
         self.game_id = game_id
         self.user_id = user_id
-        self.game_state = game_state
+        self.game_state = game_state if game_state is not None else {}
         self.status = status
 
     def to_dict(self):
@@ -1,7 +1,7 @@
 import uuid
 
 from datetime import datetime, timezone
-from typing import Any
+from typing import Any, Optional
 
 from sqlalchemy import JSON, UUID, DateTime, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
@@ -48,11 +48,11 @@ class UserAchievement(db.Model):
         self,
         user_id: uuid.UUID,
         achievement_id: uuid.UUID,
-        progress: dict[str, Any] = {},
+        progress: Optional[dict[str, Any]] = None,
     ):
         self.user_id = user_id
         self.achievement_id = achievement_id
-        self.progress = progress
+        self.progress = progress if progress is not None else {}
 
     def to_dict(self):
         return {
@@ -4,6 +4,7 @@ import uuid
 from sqlalchemy import (
     JSON,
     UUID,
+    BigInteger,
     DateTime,
     Float,
     ForeignKey,
@@ -44,6 +45,7 @@ class UserGameStats(db.Model):
     custom_stats: Mapped[dict[str, Any]] = mapped_column(JSON, default=dict)
 
     # Performance metrics
+    total_score: Mapped[int] = mapped_column(BigInteger, default=0)
     average_score: Mapped[float] = mapped_column(Float, default=0.00)
     best_score: Mapped[float] = mapped_column(Float, default=0.00)
 
@@ -58,12 +60,24 @@ class UserGameStats(db.Model):
     user: Mapped[User] = relationship("User", backref="game_stats")
     game: Mapped[Game] = relationship("Game", back_populates="user_stats")
 
-    __table_args__ = UniqueConstraint("user_id", "game_id", name="uq_user_game_stats")
+    __table_args__ = (
+        UniqueConstraint("user_id", "game_id", name="uq_user_game_stats"),
+    )
 
     def __init__(self, user_id: uuid.UUID, game_id: uuid.UUID):
         self.user_id = user_id
         self.game_id = game_id
 
+        # Column defaults only apply at flush; new rows are updated before that
+        self.games_played = 0
+        self.games_completed = 0
+        self.total_xp_earned = 0
+        self.total_score = 0
+        self.current_streak = 0
+        self.best_streak = 0
+        self.average_score = 0.0
+        self.best_score = 0.0
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -4,7 +4,7 @@ import enum
 from datetime import datetime, timezone
 from typing import Any, Optional
 
-from sqlalchemy import JSON, UUID, DateTime, Enum, ForeignKey, Integer, String
+from sqlalchemy import JSON, UUID, DateTime, Enum, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.extensions import db
@@ -52,6 +52,11 @@ class XPTransaction(db.Model):
     # Relationships
     user: Mapped[User] = relationship("User", backref="xp_transactions")
 
+    # XP history: a user's ledger, newest first
+    __table_args__ = (
+        Index("idx_xp_transactions_user_created", "user_id", "created_at"),
+    )
+
     def __init__(
         self,
         user_id: uuid.UUID,
@@ -60,7 +65,7 @@ class XPTransaction(db.Model):
         reference_id: Optional[str] = None,
         game_id: Optional[uuid.UUID] = None,
         session_id: Optional[uuid.UUID] = None,
-        meta: dict[str, Any] = {},
+        meta: Optional[dict[str, Any]] = None,
     ):
         self.user_id = user_id
         self.xp_amount = xp_amount
@@ -68,7 +73,7 @@ class XPTransaction(db.Model):
         self.reference_id = reference_id
         self.game_id = game_id if game_id else None
         self.session_id = session_id if session_id else None
-        self.meta = meta
+        self.meta = meta if meta is not None else {}
 
     def to_dict(self):
         return {
@@ -7,8 +7,9 @@ from typing import Any, Optional
 from flask import current_app
 from datetime import datetime, timedelta, timezone
 from werkzeug.security import generate_password_hash, check_password_hash
-from sqlalchemy import JSON, Boolean, Integer, String, DateTime, UUID
+from sqlalchemy import JSON, Boolean, Integer, String, DateTime, UUID, select, update
 from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.orm.attributes import set_committed_value
 
 from app.extensions import db
 from app.models.auth.auth_provider import AuthProvider, AuthProviderEnum
@@ -73,7 +74,7 @@ class User(db.Model):
         "AuthProvider", backref="user", lazy=True, cascade="all, delete-orphan"
     )
     refresh_tokens: Mapped[list["RefreshToken"]] = relationship(
-        "RefreshToken", backref="user", lazy=True, cascade="all, delete-orphan"
+        "RefreshToken", backref="user", lazy="dynamic", cascade="all, delete-orphan"
     )
     otp_codes: Mapped[list["OTPCode"]] = relationship(
         "OTPCode", backref="user", lazy=True, cascade="all, delete-orphan"
@@ -103,7 +104,12 @@ class User(db.Model):
         """Verify password"""
         if not self.password:
             return False
-        return check_password_hash(self.password, password)
+        return User.password_matches(self.password, password)
+
+    @staticmethod
+    def password_matches(password_hash: str, password: str) -> bool:
+        """Check a password against a stored hash; touches no ORM state"""
+        return check_password_hash(password_hash, password)
 
     # OAuth Provider Methods
     def get_auth_provider(self, provider: AuthProviderEnum):
@@ -231,12 +237,34 @@ class User(db.Model):
 
     def calculate_level(self):
         """Calculate level based on XP using a simple formula"""
-        return max(1, int(math.sqrt(self.total_xp / 100)))
+        # Integer square root: exact for any total, no float rounding
+        return max(1, math.isqrt(max(0, self.total_xp) // 100))
 
     def add_xp(self, amount: int):
-        """Add XP and update level"""
+        """Add XP atomically in SQL and update level"""
         old_level = self.current_level
-        self.total_xp += amount
+
+        # total_xp = total_xp + :amount, so concurrent awards can't overwrite each other
+        statement = (
+            update(User)
+            .where(User.id == self.id)
+            .values(total_xp=User.total_xp + amount)
+            .execution_options(synchronize_session=False)
+        )
+
+        if db.session.get_bind().dialect.update_returning:
+            new_total_xp = db.session.execute(
+                statement.returning(User.total_xp)
+            ).scalar_one()
+        else:
+            # No UPDATE ... RETURNING (MySQL): the UPDATE's row lock is still
+            # held, so reading back gives the value just written
+            db.session.execute(statement)
+            new_total_xp = db.session.execute(
+                select(User.total_xp).where(User.id == self.id)
+            ).scalar_one()
+        set_committed_value(self, "total_xp", new_total_xp)
+
         self.current_level = self.calculate_level()
 
         return self.current_level > old_level
@@ -250,7 +278,7 @@ class User(db.Model):
             )
             if payload.get("type") != "access":
                 return None
-            user = User.query.get(payload["user_id"])
+            user = db.session.get(User, payload["user_id"])
             if user and user.is_active and not user.is_deleted:
                 return user
             return None
@@ -0,0 +1,3 @@
+from .response import dump_user, user_response
+
+__all__ = ["dump_user", "user_response"]
@@ -0,0 +1,27 @@
+from typing import Any
+
+from app.models.user import User
+
+
+def dump_user(user: User) -> dict[str, Any]:
+    """Serialize a user the same shape as UserResponseSchema, without marshmallow"""
+    return {
+        "id": str(user.id),
+        "username": user.username,
+        "email": user.email,
+        "avatar_url": user.avatar_url,
+        "is_email_verified": user.is_email_verified,
+        "is_active": user.is_active,
+        "created_at": user.created_at.isoformat() if user.created_at else None,
+        "updated_at": user.updated_at.isoformat() if user.updated_at else None,
+    }
+
+
+def user_response(user: User) -> dict[str, Any]:
+    """
+    Success envelope for single-user endpoints
+
+    Mirrors CreateUserResponseSchema / GetUserByIdResponseSchema /
+    UpdateUserResponseSchema, which are kept for the API docs only.
+    """
+    return {"is_success": True, "data": dump_user(user)}
@@ -3,20 +3,15 @@ from marshmallow import ValidationError
 
 from app.extensions import db
 from app.models.user import User
+from app.responses.user import user_response
 from app.schemas.user import (
     GetAllUsersInputSchema,
     GetAllUsersResponseSchema,
     GetUserByIdInputSchema,
-    GetUserByIdResponseSchema,
-    UserResponseSchema,
 )
 
 bp: Blueprint = Blueprint("users", __name__)
 
-# Initialize schemas
-user_response_schema = UserResponseSchema()
-users_response_schema = UserResponseSchema(many=True)
-
 
 @bp.route("/user/get_all_users", methods=["GET"])
 def get_all_users() -> Response | tuple[Response, int]:
@@ -74,8 +69,9 @@ def get_all_users() -> Response | tuple[Response, int]:
                     type: object
                     properties:
                       id:
-                        type: integer
-                        example: 1
+                        type: string
+                        format: uuid
+                        example: 3fa85f64-5717-4562-b3fc-2c963f66afa6
                       username:
                         type: string
                         example: johndoe
@@ -228,8 +224,9 @@ def get_user_by_id() -> Response | tuple[Response, int]:
               type: object
               properties:
                 id:
-                  type: integer
-                  example: 1
+                  type: string
+                  format: uuid
+                  example: 3fa85f64-5717-4562-b3fc-2c963f66afa6
                 name:
                   type: string
                   example: johndoe
@@ -287,10 +284,7 @@ def get_user_by_id() -> Response | tuple[Response, int]:
         if not user:
             return jsonify({"error": "User not found"}), 404
 
-        response = {"data": user}
-        serialized_data = GetUserByIdResponseSchema().dump(response)
-
-        return jsonify(serialized_data), 200
+        return jsonify(user_response(user)), 200
 
     except ValidationError as e:
         return jsonify({"error": e.messages}), 400
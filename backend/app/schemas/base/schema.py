@@ -1,4 +1,6 @@
-from marshmallow import Schema, EXCLUDE, fields
+import typing
+
+from marshmallow import Schema, EXCLUDE, fields, missing
 
 
 class BaseSchema(Schema):
@@ -12,6 +14,35 @@ class BaseSchema(Schema):
         # Preserve field order
         ordered = True
 
+    def _init_fields(self) -> None:
+        super()._init_fields()
+
+        # Snapshot (attr_name, field, output_key) once so dumps iterate a tuple
+        # instead of building a dict_items view and resolving data_key per field
+        self._dump_plan = tuple(
+            (
+                attr_name,
+                field_obj,
+                field_obj.data_key if field_obj.data_key is not None else attr_name,
+            )
+            for attr_name, field_obj in self.dump_fields.items()
+        )
+
+    def _serialize(self, obj: typing.Any, *, many: bool = False):
+        if many and obj is not None:
+            return [self._serialize(d, many=False) for d in obj]
+
+        ret = self.dict_class()
+        get_attribute = self.get_attribute
+
+        for attr_name, field_obj, key in self._dump_plan:
+            value = field_obj.serialize(attr_name, obj, accessor=get_attribute)
+            if value is missing:
+                continue
+            ret[key] = value
+
+        return ret
+
 
 class SuccessSchema(Schema):
     message = fields.Str(required=True)
@@ -1,21 +1,25 @@
+import re
+
 from marshmallow import Schema, ValidationError, fields, validate, validates
 from app.schemas.base import BaseSchema, PaginationOutputSchema, SuccessSchema
 from app.schemas.mixins import StripLowerMixin
 
+# Matches any letter (word characters minus digits and underscore)
+_HAS_ALPHA = re.compile(r"[^\W\d_]").search
+
 
 class UserResponseSchema(BaseSchema):
     """Schema for user responses"""
 
-    id = fields.Int(dump_only=True)
+    id = fields.UUID(dump_only=True)
     username = fields.Str()
     email = fields.Email()
     avatar_url = fields.Str(required=False)
     is_email_verified = fields.Bool()
     is_active = fields.Bool()
-    is_deleted = fields.Bool()
 
-    created_at = fields.DateTime(format="utc", dump_only=True)
-    updated_at = fields.DateTime(format="utc", dump_only=True)
+    created_at = fields.DateTime(format="iso", dump_only=True)
+    updated_at = fields.DateTime(format="iso", dump_only=True)
 
 
 class CreateUserInputSchema(StripLowerMixin, BaseSchema):
@@ -50,13 +54,10 @@ class CreateUserInputSchema(StripLowerMixin, BaseSchema):
     )
 
     @validates("username")
-    def validate_name(self, value):
+    def validate_name(self, value: str, **kwargs):
         """Additional validation for name"""
-        if not value or not value.strip():
-            raise ValidationError("Name cannot be empty or just whitespace.")
-
-        # Check if name contains at least one letter
-        if not any(c.isalpha() for c in value):
+        # StripLowerMixin strips the value and Length(min=8) rejects blanks
+        if not _HAS_ALPHA(value):
             raise ValidationError("Name must contain at least one letter.")
 
 
@@ -123,11 +124,9 @@ class UpdateUserInputSchema(StripLowerMixin, BaseSchema):
     avatar_url = fields.Str()
 
     @validates("username")
-    def validate_username(self, value: str):
+    def validate_username(self, value: str, **kwargs):
         """Validation for name"""
-        if not value or not value.strip():
-            raise ValidationError("Name cannot be empty or just whitespace.")
-        if not any(c.isalpha() for c in value):
+        if not _HAS_ALPHA(value):
             raise ValidationError("Name must contain at least one letter.")
 
 
@@ -1,7 +1,9 @@
 import uuid
 
 from datetime import datetime, timezone
-from typing import Any, Optional, Tuple
+from typing import Any, NamedTuple, Optional, Tuple
+
+from sqlalchemy import bindparam, select
 
 from app.extensions import db
 from app.models.game.achievement import Achievement
@@ -9,86 +11,148 @@ from app.models.game.user_achievement.model import UserAchievement
 from app.models.game.user_game_stats.model import UserGameStats
 from app.models.game.xp_transaction.model import XPTransactionTypeEnum
 from app.models.user.model import User
+from app.utils import ModelSnapshotCache
 
 from app.services.xp_service import XPService
 
 
+class ActiveAchievement(NamedTuple):
+    """Detached snapshot of an active achievement, safe to share across requests"""
+
+    id: uuid.UUID
+    name: str
+    xp_reward: int
+    requirement_definition: dict[str, Any]
+
+
+# Keyed by game id (None for platform-wide); cleared on any achievement write
+_ACTIVE_ACHIEVEMENTS: ModelSnapshotCache[tuple[ActiveAchievement, ...]] = (
+    ModelSnapshotCache(Achievement, maxsize=1024)
+)
+
+# Statements are built once; SQLAlchemy's compiled cache reuses their SQL
+_ACTIVE_PLATFORM_ACHIEVEMENTS = select(Achievement).where(
+    Achievement.is_active.is_(True), Achievement.game_id.is_(None)
+)
+_ACTIVE_GAME_ACHIEVEMENTS = select(Achievement).where(
+    Achievement.is_active.is_(True),
+    db.or_(Achievement.game_id == bindparam("game_id"), Achievement.game_id.is_(None)),
+)
+
+
 class AchievementService:
     """Service for managing achievements"""
 
     @staticmethod
-    def check_achievements(user_id: uuid.UUID, game_id: Optional[uuid.UUID] = None):
-        """Check if user has unlocked any new achievements"""
+    def check_achievements(
+        user_id: uuid.UUID, game_id: Optional[uuid.UUID] = None, commit: bool = True
+    ) -> list[Achievement]:
+        """
+        Check if user has unlocked any new achievements
 
-        # Get all active achievements for this game (or platform-wide)
-        query = Achievement.query.filter_by(is_active=True)
+        Pass commit=False to leave the commit to the caller.
+        Returns: the newly unlocked Achievement models
+        """
 
-        if game_id:
-            query = query.filter(
-                db.or_(Achievement.game_id == game_id, Achievement.game_id.is_(None))
-            )
-        else:
-            query = query.filter(Achievement.game_id.is_(None))
+        achievements = AchievementService._get_active_achievements(game_id)
 
-            achievements: list[Achievement] = query.all()
+        unlocked: list[uuid.UUID] = []
 
-            unlocked = []
+        # Achievements unlocked by the same event share one timestamp
+        now = datetime.now(timezone.utc)
 
-            for achievement in achievements:
-                # Check if user already has this achievement
-                user_achievement: UserAchievement | None = (
-                    UserAchievement.query.filter_by(
-                        user_id=user_id, achievement_id=achievement.id
-                    ).first()
-                )
+        for achievement in achievements:
+            # Check if user already has this achievement
+            user_achievement: UserAchievement | None = UserAchievement.query.filter_by(
+                user_id=user_id, achievement_id=achievement.id
+            ).first()
 
-                if user_achievement and user_achievement.unlocked_at:
-                    continue
+            if user_achievement and user_achievement.unlocked_at:
+                continue
 
-                # Check if requirements are met
-                is_unlocked, progress = AchievementService._check_requirement(
+            # Check if requirements are met
+            is_unlocked, progress = AchievementService._check_requirement(
+                user_id=user_id,
+                requirement_def=achievement.requirement_definition,
+                game_id=game_id,
+            )
+
+            if not user_achievement:
+                # Create tracking record
+                user_achievement = UserAchievement(
                     user_id=user_id,
-                    requirement_def=achievement.requirement_definition,
-                    game_id=game_id,
+                    achievement_id=achievement.id,
+                    progress=progress,
                 )
+                db.session.add(user_achievement)
+            else:
+                # Update progress
+                user_achievement.progress = progress
 
-                if not user_achievement:
-                    # Create tracking record
-                    user_achievement = UserAchievement(
+            if is_unlocked:
+                # Unlock achievement
+                user_achievement.unlocked_at = now
+
+                # Increment unlock count in SQL so the cached snapshot stays valid
+                Achievement.query.filter_by(id=achievement.id).update(
+                    {Achievement.unlock_count: Achievement.unlock_count + 1},
+                    synchronize_session=False,
+                )
+
+                # Award XP
+                if achievement.xp_reward > 0:
+                    XPService.award_xp(
                         user_id=user_id,
-                        achievement_id=achievement.id,
-                        progress=progress,
+                        amount=achievement.xp_reward,
+                        transaction_type=XPTransactionTypeEnum.ACHIEVEMENT,
+                        game_id=game_id,
+                        reference_id=achievement.id,
+                        meta={
+                            "achievement_name": achievement.name,
+                        },
+                        commit=False,
                     )
-                    db.session.add(user_achievement)
-                else:
-                    # Update progress
-                    user_achievement.progress = progress
 
-                if is_unlocked:
-                    # Unlock achievement
-                    user_achievement.unlocked_at = datetime.now(timezone.utc)
+                unlocked.append(achievement.id)
 
-                    # Increment unlock count
-                    achievement.unlock_count += 1
+        if commit:
+            db.session.commit()
 
-                    # Award XP
-                    if achievement.xp_reward > 0:
-                        XPService.award_xp(
-                            user_id=user_id,
-                            amount=achievement.xp_reward,
-                            transaction_type=XPTransactionTypeEnum.ACHIEVEMENT,
-                            game_id=game_id,
-                            reference_id=achievement.id,
-                            meta={
-                                "achievement_name": achievement.name,
-                            },
-                        )
+        if not unlocked:
+            return []
 
-                    unlocked.append(achievement)
+        # The cache holds snapshots; callers get models, loaded only on unlock
+        by_id = {
+            achievement.id: achievement
+            for achievement in Achievement.query.filter(Achievement.id.in_(unlocked))
+        }
+        return [by_id[achievement_id] for achievement_id in unlocked]
 
-                db.session.commit()
+    @staticmethod
+    def _get_active_achievements(
+        game_id: Optional[uuid.UUID] = None,
+    ) -> tuple[ActiveAchievement, ...]:
+        """Get active achievements for a game (or platform-wide), cached with a TTL"""
 
-                return unlocked
+        def load() -> tuple[ActiveAchievement, ...]:
+            if game_id:
+                result = db.session.execute(
+                    _ACTIVE_GAME_ACHIEVEMENTS, {"game_id": game_id}
+                )
+            else:
+                result = db.session.execute(_ACTIVE_PLATFORM_ACHIEVEMENTS)
+
+            return tuple(
+                ActiveAchievement(
+                    id=achievement.id,
+                    name=achievement.name,
+                    xp_reward=achievement.xp_reward,
+                    requirement_definition=achievement.requirement_definition,
+                )
+                for achievement in result.scalars()
+            )
+
+        return _ACTIVE_ACHIEVEMENTS.get_or_load(game_id, load)
 
     @staticmethod
     def _check_requirement(
@@ -125,7 +189,7 @@ class AchievementService:
                 stat_value = getattr(stats, stat_name, 0)
             else:
                 # Platform-wide stat
-                user = User.query.get(user_id)
+                user = db.session.get(User, user_id)
                 stat_value = getattr(user, stat_name, 0)
 
             progress = {
@@ -203,7 +267,12 @@ class AchievementService:
     def get_user_achievements(
         user_id: uuid.UUID, game_id: Optional[uuid.UUID], unlocked_only=False
     ):
-        """Get achievements for a user"""
+        """
+        Get achievements for a user
+
+        Rows are streamed in batches of 100, so iterate the result rather than
+        indexing into it.
+        """
         query = (
             db.session.query(Achievement, UserAchievement)
             .outerjoin(
@@ -224,4 +293,4 @@ class AchievementService:
         if unlocked_only:
             query = query.filter(UserAchievement.unlocked_at.isnot(None))
 
-        return query.all()
+        return query.yield_per(100)
@@ -1,15 +1,72 @@
+import os
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, cast
 
+from flask import current_app
+
 from app.models.auth.auth_provider import AuthProvider, AuthProviderEnum
 from app.models.auth.refresh_token import RefreshToken
 from app.models.user import User
 from app.models.auth.otp_code import OTPCode
 from app.extensions import db
 
+# Provider names as sent by clients, in either case
+_PROVIDER_LOOKUP: dict[str, AuthProviderEnum] = {
+    **{p.value: p for p in AuthProviderEnum},
+    **{p.value.lower(): p for p in AuthProviderEnum},
+}
+
+# pbkdf2 hashing releases the GIL, so a small pool bounds how many logins
+# can be burning CPU at once without tying up every request thread
+_PASSWORD_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+_PASSWORD_POOL = ThreadPoolExecutor(
+    max_workers=_PASSWORD_WORKERS,
+    thread_name_prefix="password-verify",
+)
+# Caps running + queued verifications; past this, logins are turned away
+# instead of piling up behind hashes whose callers already timed out
+_PASSWORD_SLOTS = threading.BoundedSemaphore(_PASSWORD_WORKERS * 4)
+
+
+class PasswordQueueFullError(RuntimeError):
+    """Raised when too many password verifications are already pending"""
+
 
 class AuthService:
     """Authentication service with OTP, 2FA, and OAuth support"""
 
+    @staticmethod
+    def _verify_password(user: User, password: str) -> bool:
+        """Verify a password on the bounded hashing pool"""
+        if not user.password:
+            return False
+
+        if not _PASSWORD_SLOTS.acquire(blocking=False):
+            current_app.logger.warning("Password verification queue is full")
+            raise PasswordQueueFullError("Password verification queue is full")
+
+        try:
+            # The hash is passed in; worker threads must not touch the ORM
+            future = _PASSWORD_POOL.submit(
+                User.password_matches, user.password, password
+            )
+        except BaseException:
+            _PASSWORD_SLOTS.release()
+            raise
+        future.add_done_callback(lambda _: _PASSWORD_SLOTS.release())
+
+        try:
+            return future.result(
+                timeout=current_app.config["PASSWORD_VERIFY_TIMEOUT_SECONDS"]
+            )
+        except TimeoutError:
+            current_app.logger.warning("Password verification timed out")
+            # Drop the hash if it hasn't started; nobody is waiting for it
+            future.cancel()
+            raise
+
     @staticmethod
     def send_login_otp(email):
         """Send OTP for passwordless login"""
@@ -66,8 +123,8 @@ class AuthService:
 
             user = User(username=username, email=email, password=password)
             db.session.add(user)
-            db.session.commit()
-            db.session.refresh(user)
+            # Flush for user.id; the user is committed together with the OTP
+            db.session.flush()
 
             OTPCode.create_and_send(
                 purpose="email_verification", email=email, user_id=user.id
@@ -97,7 +154,7 @@ class AuthService:
             if user.is_account_locked():
                 return None, None, None, "Account is locked"
 
-            if not user.verify_password(password):
+            if not AuthService._verify_password(user, password):
                 user.increment_failed_login()
                 return None, None, None, "Invalid credentials"
 
@@ -108,6 +165,9 @@ class AuthService:
 
             return access_token, refresh_token, user, None
 
+        except (PasswordQueueFullError, TimeoutError):
+            return None, None, None, "Login is busy, please try again"
+
         except Exception as e:
             return None, None, None, str(e)
 
@@ -183,8 +243,7 @@ class AuthService:
             user.failed_login_attempts = 0
             user.locked_until = None
 
-            for token in user.refresh_tokens:
-                token.revoke()
+            RefreshToken.revoke_all_for_user(user.id)
 
             db.session.commit()
 
@@ -230,8 +289,7 @@ class AuthService:
     def logout_all_devices(user: User):
         """Logout from all devices by revoking all refresh tokens"""
         try:
-            for token in user.refresh_tokens:
-                token.revoke()
+            RefreshToken.revoke_all_for_user(user.id)
 
             db.session.commit()
 
@@ -267,10 +325,9 @@ class AuthService:
         try:
             # Convert string to enum
             if isinstance(provider, str):
-                try:
-                    provider = AuthProviderEnum(provider.lower())
-                except ValueError:
+                if provider not in _PROVIDER_LOOKUP:
                     return None, None, None, f"Unsupported provider: {provider}"
+                provider = _PROVIDER_LOOKUP[provider]
 
             # Find user by OAuth provider
             user = AuthProvider.find_by_provider(provider, provider_user_id)
@@ -333,10 +390,9 @@ class AuthService:
         """
         try:
             if isinstance(provider, str):
-                try:
-                    provider = AuthProviderEnum(provider.lower())
-                except ValueError:
+                if provider not in _PROVIDER_LOOKUP:
                     return False, f"Unsupported provider: {provider}"
+                provider = _PROVIDER_LOOKUP[provider]
 
             # Check if provider already linked to another user
             existing = AuthProvider.find_by_provider(provider, provider_user_id)
@@ -369,10 +425,9 @@ class AuthService:
         """
         try:
             if isinstance(provider, str):
-                try:
-                    provider = AuthProviderEnum(provider.lower())
-                except ValueError:
+                if provider not in _PROVIDER_LOOKUP:
                     return False, f"Unsupported provider: {provider}"
+                provider = _PROVIDER_LOOKUP[provider]
 
             # Check if user has password or other providers
             user_auth_providers = cast(List[AuthProvider], user.auth_providers)
@@ -1,14 +1,41 @@
 import uuid
 
-from typing import Any, Optional
+from functools import lru_cache
+from typing import Any, NamedTuple, Optional, cast
 from datetime import datetime, timedelta, timezone
-from sqlalchemy import desc, func
+from flask import current_app
+from sqlalchemy import bindparam, desc, func, select, tuple_, update
 
 from app.extensions import db
-from app.models.game.leaderboard import Leaderboard
+from app.leaderboard_ranks import rank_flush_queue
+from app.models.game.leaderboard import Leaderboard, LeaderboardTimePeriodEnum
 from app.models.game.leaderboard_entry import LeaderboardEntry
 from app.models.game.user_game_stats.model import UserGameStats
 from app.models.user.model import User
+from app.utils import ModelSnapshotCache
+
+
+class ActiveLeaderboard(NamedTuple):
+    """Detached snapshot of an active leaderboard, safe to share across requests"""
+
+    id: uuid.UUID
+    game_id: Optional[uuid.UUID]
+    ranking_criteria: dict[str, Any]
+    time_period: LeaderboardTimePeriodEnum
+
+
+# Keyed by game id (None for platform-wide); cleared on any leaderboard write
+_ACTIVE_LEADERBOARDS: ModelSnapshotCache[tuple[ActiveLeaderboard, ...]] = (
+    ModelSnapshotCache(Leaderboard, maxsize=64)
+)
+
+_ACTIVE_PLATFORM_LEADERBOARDS = select(Leaderboard).where(
+    Leaderboard.is_active.is_(True)
+)
+_ACTIVE_GAME_LEADERBOARDS = select(Leaderboard).where(
+    Leaderboard.is_active.is_(True),
+    db.or_(Leaderboard.game_id == bindparam("game_id"), Leaderboard.game_id.is_(None)),
+)
 
 
 class LeaderboardService:
@@ -17,102 +44,171 @@ class LeaderboardService:
     @staticmethod
     def update_user_rakings(user_id: uuid.UUID, game_id: Optional[uuid.UUID] = None):
         """Update user's rankings across all relevant leaderboards"""
-        # Find all active leaderboards for this game
-        query = Leaderboard.query.filter_by(is_active=True)
-
-        if game_id:
-            query = query.filter(
-                db.or_(Leaderboard.game_id == game_id, Leaderboard.game_id.is_(None))
+        # Find all active leaderboards for this game; only per-game ones are ranked
+        leaderboards = [
+            lb
+            for lb in LeaderboardService._get_active_leaderboards(game_id)
+            if lb.game_id
+        ]
+        if not leaderboards:
+            return
+
+        game_ids = {lb.game_id for lb in leaderboards}
+
+        periods = {
+            lb.id: LeaderboardService._get_period_boundaries(time_period=lb.time_period)
+            for lb in leaderboards
+        }
+
+        # One query for the user's stats across every game involved
+        stats_by_game: dict[uuid.UUID, UserGameStats] = {
+            stats.game_id: stats
+            for stats in UserGameStats.query.filter(
+                UserGameStats.user_id == user_id,
+                UserGameStats.game_id.in_(game_ids),
             )
+        }
+
+        # One query for the user's entries in each leaderboard's current period
+        entries_by_leaderboard: dict[uuid.UUID, LeaderboardEntry] = {
+            entry.leaderboard_id: entry
+            for entry in LeaderboardEntry.query.filter(
+                LeaderboardEntry.user_id == user_id,
+                tuple_(
+                    LeaderboardEntry.leaderboard_id, LeaderboardEntry.period_start
+                ).in_([(lb_id, start) for lb_id, (start, _) in periods.items()]),
+            )
+        }
+
+        # The user row is only needed for global XP rankings
+        user: Optional[User] = None
+        if any(lb.ranking_criteria.get("type") == "total_xp" for lb in leaderboards):
+            user = db.session.get(User, user_id)
 
-        leaderboards: list[Leaderboard] = query.all()
+        updated: list[tuple[uuid.UUID, datetime]] = []
 
         for leaderboard in leaderboards:
-            if leaderboard.game_id:
-                LeaderboardService._update_leaderboard_entry(
-                    leaderboard, user_id, game_id=leaderboard.game_id
+            period_start, period_end = periods[leaderboard.id]
+
+            if LeaderboardService._update_leaderboard_entry(
+                leaderboard,
+                user_id,
+                user=user,
+                # game_id is set: only per-game leaderboards were kept above
+                stats=stats_by_game.get(cast(uuid.UUID, leaderboard.game_id)),
+                entry=entries_by_leaderboard.get(leaderboard.id),
+                period_start=period_start,
+                period_end=period_end,
+            ):
+                updated.append((leaderboard.id, period_start))
+
+        db.session.commit()
+
+        # Only queue recalculation once the new scores are visible to the flusher
+        for leaderboard_id, period_start in updated:
+            LeaderboardService._mark_ranks_dirty(
+                leaderboard_id=leaderboard_id, period_start=period_start
+            )
+
+    @staticmethod
+    def _get_active_leaderboards(
+        game_id: Optional[uuid.UUID] = None,
+    ) -> tuple[ActiveLeaderboard, ...]:
+        """Get active leaderboards for a game (or platform-wide), cached with a TTL"""
+
+        def load() -> tuple[ActiveLeaderboard, ...]:
+            if game_id:
+                result = db.session.execute(
+                    _ACTIVE_GAME_LEADERBOARDS, {"game_id": game_id}
                 )
+            else:
+                result = db.session.execute(_ACTIVE_PLATFORM_LEADERBOARDS)
+
+            return tuple(
+                ActiveLeaderboard(
+                    id=leaderboard.id,
+                    game_id=leaderboard.game_id,
+                    ranking_criteria=leaderboard.ranking_criteria,
+                    time_period=leaderboard.time_period,
+                )
+                for leaderboard in result.scalars()
+            )
+
+        return _ACTIVE_LEADERBOARDS.get_or_load(game_id, load)
 
     @staticmethod
     def _update_leaderboard_entry(
-        leaderboard: Leaderboard, user_id: uuid.UUID, game_id: uuid.UUID
-    ):
-        """Update a specific leaderboard entry for a user"""
+        leaderboard: ActiveLeaderboard,
+        user_id: uuid.UUID,
+        user: Optional[User],
+        stats: Optional[UserGameStats],
+        entry: Optional[LeaderboardEntry],
+        period_start: datetime,
+        period_end: Optional[datetime],
+    ) -> bool:
+        """
+        Update a specific leaderboard entry for a user
+
+        The caller prefetches the user, their stats and the current-period entry
+        and commits once for all leaderboards.
+        Returns: whether the entry was written
+        """
 
         # Calculate score based on ranking criteria
         score_value = LeaderboardService._calculate_score(
-            user_id=user_id,
-            game_id=game_id,
+            stats=stats,
+            user=user,
             ranking_criteria=leaderboard.ranking_criteria,
         )
 
         if score_value is None:
-            return  # User doesn't qualify
-
-        # Get time period boundaries
-        period_start, period_end = LeaderboardService._get_period_boundaries(
-            time_period=leaderboard.time_period
-        )
-
-        # Find or create entry
-        entry: LeaderboardEntry | None = LeaderboardEntry.query.filter_by(
-            leaderboard_id=leaderboard.id, user_id=user_id, period_start=period_start
-        ).first()
+            return False  # User doesn't qualify
 
         if not entry:
+            # Provisional rank until the next flush renumbers the period
+            higher = (
+                db.session.query(func.count(LeaderboardEntry.id))
+                .filter(
+                    LeaderboardEntry.leaderboard_id == leaderboard.id,
+                    LeaderboardEntry.period_start == period_start,
+                    LeaderboardEntry.score_value > score_value,
+                )
+                .scalar()
+            )
             entry = LeaderboardEntry(
                 leaderboard_id=leaderboard.id,
                 user_id=user_id,
                 period_start=period_start,
                 period_end=period_end,
                 score_value=score_value,
-                rank=0,
+                rank=higher + 1,
             )
             db.session.add(entry)
         else:
             entry.score_value = score_value
             entry.last_updated = datetime.now(timezone.utc)
 
-        # Get games played count
-        if leaderboard.game_id:
-            stats = UserGameStats.query.filter_by(
-                user_id=user_id, game_id=leaderboard.game
-            ).first()
-            entry.games_played = stats.games_completed if stats else 0
-        else:
-            # Global leaderboard
-            entry.games_played = (
-                db.session.query(func.sum(UserGameStats.games_completed))
-                .filter_by(user_id=user_id)
-                .scalar()
-                or 0
-            )
+        # Only per-game leaderboards are ranked, so the game's stats hold the count
+        entry.games_played = stats.games_completed if stats else 0
 
-        db.session.commit()
-
-        LeaderboardService._recalculate_ranks(
-            leaderboard_id=leaderboard.id, period_start=period_start
-        )
+        return True
 
     @staticmethod
     def _calculate_score(
-        user_id: uuid.UUID, game_id: uuid.UUID, ranking_criteria: dict[str, Any]
+        stats: Optional[UserGameStats],
+        user: Optional[User],
+        ranking_criteria: dict[str, Any],
     ):
-        """Calculate score based on ranking criteria"""
+        """Calculate score based on ranking criteria from already-loaded rows"""
 
         criteria_type = ranking_criteria.get("type")
 
         if criteria_type == "total_xp":
             # Global XP
-            user: User | None = User.query.get(user_id)
             return float(user.total_xp) if user else None
 
         elif criteria_type == "game_xp":
             # Game-specific XP
-            stats = UserGameStats.query.filter_by(
-                user_id=user_id, game_id=game_id
-            ).first()
-
             if not stats:
                 return None
 
@@ -124,11 +220,6 @@ class LeaderboardService:
 
         elif criteria_type == "best_score":
             # Best score in a game
-            stats = UserGameStats.query.filter_by(
-                user_id=user_id,
-                game_id=game_id,
-            ).first()
-
             if not stats:
                 return None
 
@@ -140,10 +231,6 @@ class LeaderboardService:
 
         elif criteria_type == "average_score":
             # Average score
-            stats = UserGameStats.query.filter_by(
-                user_id=user_id, game_id=game_id
-            ).first()
-
             if not stats:
                 return None
 
@@ -155,35 +242,39 @@ class LeaderboardService:
 
         elif criteria_type == "games_completed":
             # Total games completed
-            stats = UserGameStats.query.filter_by(
-                user_id=user_id, game_id=game_id
-            ).first()
-
             return float(stats.games_completed) if stats else None
 
         return None
 
     @staticmethod
-    def _get_period_boundaries(time_period):
+    def _get_period_boundaries(time_period: LeaderboardTimePeriodEnum):
         """Get start and end datetime for a time period"""
 
-        now = datetime.now(timezone.utc)
+        # Boundaries only move at midnight, so one result per minute is plenty
+        now = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+
+        return LeaderboardService._period_boundaries_at(time_period, now)
+
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def _period_boundaries_at(time_period: LeaderboardTimePeriodEnum, now: datetime):
+        """Get start and end datetime for a time period as of `now`"""
 
-        if time_period == "all_time":
+        if time_period == LeaderboardTimePeriodEnum.ALL_TIME:
             return datetime(2026, 1, 1), None
 
-        elif time_period == "daily":
+        elif time_period == LeaderboardTimePeriodEnum.DAILY:
             start = now.replace(hour=0, minute=0, second=0, microsecond=0)
             end = start + timedelta(days=1)
             return start, end
 
-        elif time_period == "weekly":
+        elif time_period == LeaderboardTimePeriodEnum.WEEKLY:
             start = now - timedelta(days=now.weekday())
             start = start.replace(hour=0, minute=0, second=0, microsecond=0)
             end = start + timedelta(days=7)
             return start, end
 
-        elif time_period == "monthly":
+        elif time_period == LeaderboardTimePeriodEnum.MONTHLY:
             start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
             # Next month
             if start.month == 12:
@@ -195,27 +286,78 @@ class LeaderboardService:
         return now, None
 
     @staticmethod
-    def _recalculate_ranks(leaderboard_id: uuid.UUID, period_start: datetime):
-        """Recalculate ranks for all entries in a leaderboard period"""
+    def _mark_ranks_dirty(leaderboard_id: uuid.UUID, period_start: datetime):
+        """
+        Queue a leaderboard period for rank recalculation
 
-        entries: list[LeaderboardEntry] = (
-            LeaderboardEntry.query.filter_by(
-                leaderboard_id=leaderboard_id, period_start=period_start
+        Completions that land between two flushes share one recalculation,
+        so stored ranks may lag by up to LEADERBOARD_RANK_FLUSH_SECONDS.
+        Reads repair a stale period themselves, so a queue lost to a restart
+        only delays the fix until someone looks.
+        """
+        rank_flush_queue().add(leaderboard_id, period_start)
+
+    @staticmethod
+    def flush_dirty_ranks():
+        """Recalculate ranks once for every leaderboard period marked dirty"""
+
+        queue = rank_flush_queue()
+        dirty = queue.drain()
+
+        if not dirty:
+            return
+
+        # Commit per period so one failing period doesn't hold back the rest
+        for leaderboard_id, period_start in dirty:
+            try:
+                LeaderboardService._recalculate_ranks(
+                    leaderboard_id=leaderboard_id, period_start=period_start
+                )
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                current_app.logger.exception(
+                    "Failed to recalculate ranks for leaderboard %s", leaderboard_id
+                )
+
+                # Retry only this period on the next flush
+                queue.requeue(leaderboard_id, period_start)
+
+    @staticmethod
+    def _recalculate_ranks(leaderboard_id: uuid.UUID, period_start: datetime):
+        """
+        Recalculate ranks for all entries in a leaderboard period
+
+        Ranks are assigned by the database with ROW_NUMBER() in a single
+        UPDATE, so no entries are loaded into the session. The caller commits.
+        """
+
+        ranked = (
+            select(
+                LeaderboardEntry.id,
+                func.row_number()
+                .over(order_by=desc(LeaderboardEntry.score_value))
+                .label("position"),
             )
-            .order_by(desc(LeaderboardEntry.score_value))
-            .all()
+            .where(
+                LeaderboardEntry.leaderboard_id == leaderboard_id,
+                LeaderboardEntry.period_start == period_start,
+            )
+            .subquery()
         )
 
-        for idx, entry in enumerate(entries, start=1):
-            entry.rank = idx
-
-        db.session.commit()
+        db.session.execute(
+            update(LeaderboardEntry)
+            .where(LeaderboardEntry.id == ranked.c.id)
+            .values(rank=ranked.c.position)
+            .execution_options(synchronize_session=False)
+        )
 
     @staticmethod
     def get_leaderboard(leaderboard_id: uuid.UUID, limit=100, offset=0):
         """Get leaderboard entries"""
 
-        leaderboard: Leaderboard | None = Leaderboard.query.get(leaderboard_id)
+        leaderboard: Leaderboard | None = db.session.get(Leaderboard, leaderboard_id)
         if not leaderboard:
             return None, "Leaderboard not found"
 
@@ -223,15 +365,25 @@ class LeaderboardService:
             time_period=leaderboard.time_period
         )
 
-        entries: list[LeaderboardEntry] = (
+        query = (
             LeaderboardEntry.query.filter_by(
                 leaderboard_id=leaderboard_id, period_start=period_start
             )
-            .order_by(LeaderboardEntry.rank)
+            # Stored ranks lag new scores until the next flush, so order by score
+            .order_by(LeaderboardEntry.score_value.desc(), LeaderboardEntry.rank)
             .limit(limit)
             .offset(offset)
-            .all()
         )
+        entries: list[LeaderboardEntry] = query.all()
+
+        # Fresh ranks run offset+1, offset+2, ... in this order; otherwise the
+        # period is waiting on (or lost) a flush, so renumber it now
+        if any(entry.rank != offset + i for i, entry in enumerate(entries, 1)):
+            LeaderboardService._recalculate_ranks(
+                leaderboard_id=leaderboard_id, period_start=period_start
+            )
+            db.session.commit()
+            entries = query.all()
 
         return entries, None
 
@@ -239,7 +391,7 @@ class LeaderboardService:
     def get_user_rank(leaderboard_id: uuid.UUID, user_id: uuid.UUID):
         """Get a specific user's rank on a leaderboard"""
 
-        leaderboard: Leaderboard | None = Leaderboard.query.get(leaderboard_id)
+        leaderboard: Leaderboard | None = db.session.get(Leaderboard, leaderboard_id)
         if not leaderboard:
             return None
 
@@ -250,5 +402,27 @@ class LeaderboardService:
         entry = LeaderboardEntry.query.filter_by(
             leaderboard_id=leaderboard_id, user_id=user_id, period_start=period_start
         ).first()
+        if not entry:
+            return None
+
+        # Entries ahead of this one, in the same order the flush ranks them
+        ahead = LeaderboardEntry.query.filter(
+            LeaderboardEntry.leaderboard_id == leaderboard_id,
+            LeaderboardEntry.period_start == period_start,
+            db.or_(
+                LeaderboardEntry.score_value > entry.score_value,
+                db.and_(
+                    LeaderboardEntry.score_value == entry.score_value,
+                    LeaderboardEntry.rank < entry.rank,
+                ),
+            ),
+        ).count()
+
+        # A mismatch means the period missed a flush; renumber it now
+        if entry.rank != ahead + 1:
+            LeaderboardService._recalculate_ranks(
+                leaderboard_id=leaderboard_id, period_start=period_start
+            )
+            db.session.commit()  # expires entry, so its rank reloads
 
         return entry
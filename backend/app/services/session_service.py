@@ -3,6 +3,9 @@ import uuid
 from datetime import datetime, timezone
 from typing import Any, Dict, Optional
 
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import joinedload
+
 from app.extensions import db
 from app.models.game import Game, GameSession, GameSessionStatusEnum
 from app.models.user.model import User
@@ -22,12 +25,12 @@ class SessionService:
     ) -> tuple[Optional[GameSession], Optional[str]]:
         """Start a new game session"""
 
-        game: Game | None = Game.query.get(game_id)
+        game: Game | None = db.session.get(Game, game_id)
 
         if not game or not game.is_active:
             return None, "Game not found or inactive"
 
-        user: User | None = User.query.get(user_id)
+        user: User | None = db.session.get(User, user_id)
 
         if not user:
             return None, "User not found"
@@ -51,7 +54,7 @@ class SessionService:
     def update_session_state(session_id, new_state):
         """Update the game state of an active session"""
 
-        session = GameSession.query.get(session_id)
+        session = db.session.get(GameSession, session_id)
         if not session:
             return None, "Session is not active"
 
@@ -70,7 +73,10 @@ class SessionService:
             final_score: Final score achieved
             final_stats: Dict of game-specific stats
         """
-        session = GameSession.query.get(session_id)
+        # Load the user up front; XP processing reuses this identity-map copy
+        session = db.session.get(
+            GameSession, session_id, options=[joinedload(GameSession.user)]
+        )
         if not session:
             return None, "Session not found"
 
@@ -86,17 +92,25 @@ class SessionService:
         session.duration_seconds = int(duration)
         session.completed_at = datetime.now(timezone.utc)
 
-        db.session.commit()
+        # The completion, XP, stats and achievements share one transaction,
+        # committed here
+        try:
+            xp_result = XPService.process_session_completion(
+                session_id=session_id, commit=False
+            )
 
-        # Process XP and stats
-        xp_result = XPService.process_session_completion(session_id=session_id)
+            if not xp_result:
+                db.session.rollback()
+                return None, "XP result not found"
 
-        if not xp_result:
-            return None, "XP result not found"
+            unlocked_achievements = AchievementService.check_achievements(
+                user_id=session.user_id, game_id=session.game_id, commit=False
+            )
 
-        unlocked_achievements = AchievementService.check_achievements(
-            user_id=session.user_id, game_id=session.game_id
-        )
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
 
         LeaderboardService.update_user_rakings(
             user_id=session.user_id, game_id=session.game_id
@@ -113,7 +127,7 @@ class SessionService:
     @staticmethod
     def abandon_session(session_id: uuid.UUID):
         """Mark a session as abandoned"""
-        session: GameSession | None = GameSession.query.get(session_id)
+        session: GameSession | None = db.session.get(GameSession, session_id)
         if not session:
             return None, "Session not found"
 
@@ -129,18 +143,42 @@ class SessionService:
         status: Optional[GameSessionStatusEnum],
         game_id: Optional[uuid.UUID] = None,
         limit=20,
+        before: Optional[tuple[datetime, uuid.UUID]] = None,
     ):
-        """Get sessions for a user"""
+        """
+        Get sessions for a user, newest first
+
+        Returns lightweight rows (no game_state/final_stats). Pass the last
+        row's (started_at, id) as `before` to fetch the next page; the id
+        breaks ties between sessions started at the same instant.
+        """
 
-        query = GameSession.query.filter_by(user_id=user_id)
+        query = select(
+            GameSession.id,
+            GameSession.game_id,
+            GameSession.status,
+            GameSession.score,
+            GameSession.xp_earned,
+            GameSession.completed,
+            GameSession.duration_seconds,
+            GameSession.started_at,
+            GameSession.completed_at,
+        ).where(GameSession.user_id == user_id)
 
         if game_id:
-            query = query.filter_by(game_id=game_id)
+            query = query.where(GameSession.game_id == game_id)
 
         if status:
-            query = query.filter_by(status=status)
+            query = query.where(GameSession.status == status)
+
+        if before:
+            query = query.where(tuple_(GameSession.started_at, GameSession.id) < before)
+
+        query = query.order_by(
+            GameSession.started_at.desc(), GameSession.id.desc()
+        ).limit(limit)
 
-        return query.order_by(GameSession.started_at.desc()).limit(limit).all()
+        return db.session.execute(query).all()
 
     @staticmethod
     def get_active_session(user_id: uuid.UUID, game_id: uuid.UUID):
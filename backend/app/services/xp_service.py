@@ -1,23 +1,45 @@
 import uuid
 
 from datetime import datetime, timezone
+from functools import lru_cache
 from typing import Any, Optional, TypedDict
 
+from flask import current_app
+from sqlalchemy import case, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload
+from sqlalchemy.orm.attributes import set_committed_value
+
 from app.extensions import db
-from app.models.game import XPTransaction, XPTransactionTypeEnum
+from app.models.game import Game, XPTransaction, XPTransactionTypeEnum
 from app.models.game.session.model import GameSession
 from app.models.game.user_game_stats.model import UserGameStats
 from app.models.user import User
+from app.utils import ModelSnapshotCache
 
 
 class XPAwardResult(TypedDict):
-    transaction: XPTransaction
+    transaction_id: Optional[uuid.UUID]
     new_total_xp: int
     new_level: int
     leveled_up: bool
     xp_earned: int
 
 
+class SessionXPBreakdown(TypedDict):
+    base_xp: int
+    score_xp: int
+    time_bonus: int
+    streak_bonus: int
+    total_xp: int
+
+
+# Keyed by game id; a game's entry is dropped whenever that game is written
+_XP_CALCULATIONS: ModelSnapshotCache[dict[str, Any]] = ModelSnapshotCache(
+    Game, maxsize=512, key_of=lambda game: game.id
+)
+
+
 class XPService:
     """Service for managing XP and leveling"""
 
@@ -29,32 +51,45 @@ class XPService:
         game_id=None,
         session_id=None,
         reference_id=None,
-        meta: dict[str, Any] = {},
+        meta: Optional[dict[str, Any]] = None,
+        commit: bool = True,
+        user: Optional[User] = None,
     ) -> tuple[Optional[XPAwardResult], Optional[str]]:
-        """Award XP to a user"""
+        """
+        Award XP to a user
 
-        user: User | None = User.query.get(user_id)
+        Pass `user` when it is already loaded to skip the lookup, and
+        commit=False to leave the commit to the caller.
+        """
+
+        if user is None:
+            user = db.session.get(User, user_id)
         if not user:
             return None, "User not found"
 
-        transaction = XPTransaction(
-            user_id=user_id,
-            xp_amount=amount,
-            type=transaction_type,
-            game_id=game_id,
-            session_id=session_id,
-            reference_id=reference_id,
-            meta=meta,
+        # The ledger is append-only, so write it with a Core INSERT instead of
+        # tracking an ORM instance; the id is generated here to skip RETURNING
+        transaction_id = uuid.uuid4()
+        db.session.execute(
+            insert(XPTransaction).values(
+                id=transaction_id,
+                user_id=user_id,
+                xp_amount=amount,
+                type=transaction_type,
+                game_id=game_id,
+                session_id=session_id,
+                reference_id=reference_id,
+                meta=meta if meta is not None else {},
+            )
         )
 
-        db.session.add(transaction)
-
         leveled_up = user.add_xp(amount)
 
-        db.session.commit()
+        if commit:
+            db.session.commit()
 
         return {
-            "transaction": transaction,
+            "transaction_id": transaction_id,
             "new_total_xp": user.total_xp,
             "new_level": user.current_level,
             "leveled_up": leveled_up,
@@ -62,149 +97,313 @@ class XPService:
         }, None
 
     @staticmethod
-    def process_session_completion(session_id) -> Optional[XPAwardResult]:
+    def process_session_completion(
+        session_id, commit: bool = True
+    ) -> Optional[XPAwardResult]:
         """Process XP rewards for completed session"""
 
-        session: GameSession | None = GameSession.query.get(session_id)
+        # User comes back in the same SELECT as the session
+        session: GameSession | None = db.session.get(
+            GameSession, session_id, options=[joinedload(GameSession.user)]
+        )
         if not session or not session.completed:
             return None
 
-        game = session.game
-        xp_calc = game.xp_calculation or {}
-
-        base_xp = xp_calc.get("base", 10)
+        # Shared by the streak bonus and the stats update
+        stats: UserGameStats | None = UserGameStats.query.filter_by(
+            user_id=session.user_id,
+            game_id=session.game_id,
+        ).first()
 
-        score_multiplier = xp_calc.get("score_multiplier", 0)
-        score_xp = int(session.score * score_multiplier) if score_multiplier else 0
+        breakdown = XPService.calculate_session_xp(
+            xp_calc=XPService._get_xp_calculation(session.game_id),
+            score=session.score,
+            duration_seconds=session.duration_seconds,
+            current_streak=stats.current_streak if stats else 0,
+        )
+        total_xp = breakdown["total_xp"]
+
+        user = session.user
+
+        if total_xp == 0:
+            # Nothing to award: skip the ledger row and the user update, but
+            # still count the game in the stats
+            current_app.logger.debug("Session %s earned no XP", session_id)
+
+            result: Optional[XPAwardResult] = {
+                "transaction_id": None,
+                "new_total_xp": user.total_xp,
+                "new_level": user.current_level,
+                "leveled_up": False,
+                "xp_earned": 0,
+            }
+        else:
+            result, _ = XPService.award_xp(
+                user_id=session.user_id,
+                amount=total_xp,
+                transaction_type=XPTransactionTypeEnum.GAME_COMPLETION,
+                game_id=session.game_id,
+                session_id=session_id,
+                meta={
+                    "base_xp": breakdown["base_xp"],
+                    "score_xp": breakdown["score_xp"],
+                    "time_bonus": breakdown["time_bonus"],
+                    "streak_bonus": breakdown["streak_bonus"],
+                    "score": session.score,
+                },
+                commit=False,
+                user=user,
+            )
 
-        time_bonus = XPService._calculate_time_bonus(session, xp_calc)
+        session.xp_earned = total_xp
 
-        streak_bonus = XPService._calculate_streak_bonus(
-            session.user_id, session.game_id, xp_calc
+        XPService.update_user_game_stats(
+            session.user_id, session.game_id, session, stats=stats
         )
 
-        total_xp = base_xp + score_xp + time_bonus + streak_bonus
+        # XP transaction, session and stats land in one transaction
+        if commit:
+            db.session.commit()
 
-        # Award XP
-        result, _ = XPService.award_xp(
-            user_id=session.user_id,
-            amount=total_xp,
-            transaction_type=XPTransactionTypeEnum.GAME_COMPLETION,
-            game_id=session.game_id,
-            session_id=session_id,
-            meta={
-                "base_xp": base_xp,
-                "score_xp": score_xp,
-                "time_bonus": time_bonus,
-                "streak_bonus": streak_bonus,
-                "score": session.score,
-            },
-        )
+        return result
 
-        session.xp_earned = total_xp
+    @staticmethod
+    def _get_xp_calculation(game_id: uuid.UUID) -> dict[str, Any]:
+        """Get a game's XP formula, cached with a TTL (treat as read-only)"""
 
-        XPService.update_user_game_stats(session.user_id, session.game_id, session)
+        def load() -> dict[str, Any]:
+            return (
+                db.session.execute(
+                    select(Game.xp_calculation).where(Game.id == game_id)
+                ).scalar()
+                or {}
+            )
 
-        db.session.commit()
+        return _XP_CALCULATIONS.get_or_load(game_id, load)
 
-        return result
+    @staticmethod
+    def calculate_session_xp(
+        xp_calc: dict[str, Any], score: int, duration_seconds: int, current_streak: int
+    ) -> SessionXPBreakdown:
+        """
+        Calculate the XP earned by a completed session
+
+        Pure function of the game's xp_calculation and the session's numbers,
+        so backfills and recomputes can call it without touching the database.
+        """
+
+        base_xp = xp_calc.get("base", 10)
+
+        score_multiplier = xp_calc.get("score_multiplier", 0)
+        score_xp = int(score * score_multiplier) if score_multiplier else 0
+
+        time_bonus = XPService._calculate_time_bonus(duration_seconds, xp_calc)
+
+        streak_bonus = XPService._calculate_streak_bonus(current_streak, xp_calc)
+
+        return {
+            "base_xp": base_xp,
+            "score_xp": score_xp,
+            "time_bonus": time_bonus,
+            "streak_bonus": streak_bonus,
+            "total_xp": base_xp + score_xp + time_bonus + streak_bonus,
+        }
 
     @staticmethod
-    def _calculate_time_bonus(session: GameSession, xp_calc):
+    def _calculate_time_bonus(duration_seconds: int, xp_calc):
         """Calculate bonux XP based on completion time"""
         time_bonus_config = xp_calc.get("time_bonus", {})
         if not time_bonus_config:
             return 0
 
-        target_time = time_bonus_config.get("target_seconds", 60)
-        bonus_per_second = time_bonus_config.get("bonus_per_second", 0.5)
-        max_bonus = time_bonus_config.get("max_bonus", 50)
+        return XPService._time_bonus(
+            target_time=time_bonus_config.get("target_seconds", 60),
+            bonus_per_second=time_bonus_config.get("bonus_per_second", 0.5),
+            max_bonus=time_bonus_config.get("max_bonus", 50),
+            duration_seconds=duration_seconds,
+        )
 
-        if session.duration_seconds < target_time:
-            saved_seconds = target_time * session.duration_seconds
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _time_bonus(
+        target_time: int, bonus_per_second: float, max_bonus: int, duration_seconds: int
+    ) -> int:
+        """Time bonus for a duration; a game's config repeats, so results are memoized"""
+
+        if duration_seconds < target_time:
+            saved_seconds = target_time - duration_seconds
             bonus = int(saved_seconds * bonus_per_second)
             return min(bonus, max_bonus)
 
         return 0
 
     @staticmethod
-    def _calculate_streak_bonus(user_id: uuid.UUID, game_id: uuid.UUID, xp_calc):
+    def _calculate_streak_bonus(current_streak: int, xp_calc):
         """Calculate bonus XP based on play streak"""
 
         streak_bonus_config = xp_calc.get("streak_bonus", {})
         if not streak_bonus_config:
             return 0
 
-        stats: UserGameStats | None = UserGameStats.query.filter_by(
-            user_id=user_id,
-            game_id=game_id,
-        ).first()
-
-        if not stats:
-            return 0
-
         bonus_per_day = streak_bonus_config.get("bonus_per_day", 5)
         max_bonus = streak_bonus_config.get("max_bonus", 100)
 
-        bonus = stats.current_streak * bonus_per_day
+        bonus = current_streak * bonus_per_day
         return min(bonus, max_bonus)
 
+    @staticmethod
+    def _merge_custom_stats(
+        current: Optional[dict[str, Any]], final_stats: dict[str, Any]
+    ) -> dict[str, Any]:
+        """Add numeric session stats onto the running totals; others overwrite"""
+
+        # Copy so the JSON column sees a new value
+        merged = dict(current or {})
+
+        for key, value in final_stats.items():
+            if isinstance(value, (int, float)):
+                merged[key] = merged.get(key, 0) + value
+            else:
+                merged[key] = value
+
+        return merged
+
+    @staticmethod
+    def _create_user_game_stats(
+        user_id: uuid.UUID,
+        game_id: uuid.UUID,
+        games_completed: int,
+        total_xp_earned: int,
+        score: int,
+        final_stats: dict[str, Any],
+        now: datetime,
+    ) -> Optional[UserGameStats]:
+        """
+        Insert a user's first stats row for a game inside a SAVEPOINT
+
+        Returns None if uq_user_game_stats rejected it because another
+        request created the row first.
+        """
+
+        stats = UserGameStats(user_id=user_id, game_id=game_id)
+        stats.games_played = 1
+        stats.games_completed = games_completed
+        stats.total_xp_earned = total_xp_earned
+        stats.total_score = score
+        stats.best_score = score
+        stats.average_score = score if games_completed else 0.0
+        stats.current_streak = 1
+        stats.best_streak = 1
+        stats.last_played_at = now
+        stats.custom_stats = XPService._merge_custom_stats(None, final_stats)
+
+        try:
+            with db.session.begin_nested():
+                db.session.add(stats)
+        except IntegrityError:
+            return None
+
+        return stats
+
     @staticmethod
     def update_user_game_stats(
         user_id: uuid.UUID,
         game_id: uuid.UUID,
         session: GameSession,
+        stats: Optional[UserGameStats],
     ):
-        """Update user's stats for a specific game"""
-        stats: UserGameStats | None = UserGameStats.query.filter_by(
-            user_id=user_id,
-            game_id=game_id,
-        ).first()
+        """
+        Update user's stats for a specific game (caller commits)
 
-        if not stats:
-            stats = UserGameStats(user_id=user_id, game_id=game_id)
-            db.session.add(stats)
+        `stats` is the user's existing row for the game, or None to create one.
+        """
 
-        stats.games_played += 1
-
-        if session.completed:
-            stats.games_completed += 1
-
-        stats.total_xp_earned += session.xp_earned
+        # Read the session's instrumented attributes once
+        now = datetime.now(timezone.utc)
+        completed = int(bool(session.completed))
+        score = session.score or 0
+        xp_earned = session.xp_earned
+        final_stats = session.final_stats or {}
 
+        if not stats:
+            created = XPService._create_user_game_stats(
+                user_id,
+                game_id,
+                games_completed=completed,
+                total_xp_earned=xp_earned,
+                score=score,
+                final_stats=final_stats,
+                now=now,
+            )
+            if created:
+                return
+
+            # A concurrent completion inserted the row first; update theirs
+            stats = UserGameStats.query.filter_by(
+                user_id=user_id, game_id=game_id
+            ).one()
+
+        # The streak depends on the previous play date loaded with the row
+        current_streak = stats.current_streak
         if stats.last_played_at:
-            days_since = (datetime.now(timezone.utc) - stats.last_played_at).days
+            days_since = (now - stats.last_played_at).days
             if days_since == 1:
-                stats.current_streak += 1
+                current_streak += 1
             elif days_since > 1:
-                stats.current_streak = 1
+                current_streak = 1
         else:
-            stats.current_streak = 1
-
-        stats.best_streak = max(stats.best_streak, stats.current_streak)
-        stats.last_played_at = datetime.now(timezone.utc)
-
-        if session.final_stats:
-            current_stats = stats.custom_stats or {}
-
-            for key, value in session.final_stats.items():
-                if isinstance(value, (int, float)):
-                    current_stats[key] = current_stats.get(key, 0) + value
-                else:
-                    current_stats[key] = value
-
-            stats.custom_stats = current_stats
-
-        if session.score:
-            if stats.best_score < session.score:
-                stats.best_score = session.score
-
-            if stats.average_score == 0:
-                stats.average_score = session.score
-            else:
-                total_score = (
-                    stats.average_score * (stats.games_completed - 1) + session.score
-                )
-                stats.average_score = total_score / stats.games_completed
+            current_streak = 1
+
+        games_completed = UserGameStats.games_completed + completed
+        total_score = UserGameStats.total_score + score
+
+        # One UPDATE for every column; counters are incremented in SQL so
+        # concurrent completions can't lose updates. MySQL evaluates SET
+        # assignments left to right against the already-updated row, so the
+        # average is assigned before the counters it is derived from.
+        values: dict[Any, Any] = {
+            # Derived from the running sum, so float error doesn't accumulate
+            UserGameStats.average_score: func.coalesce(
+                # * 1.0 forces true division; MySQL can't CAST to FLOAT
+                (total_score * 1.0) / func.nullif(games_completed, 0),
+                UserGameStats.average_score,
+            ),
+            UserGameStats.games_played: UserGameStats.games_played + 1,
+            UserGameStats.games_completed: games_completed,
+            UserGameStats.total_xp_earned: UserGameStats.total_xp_earned + xp_earned,
+            UserGameStats.total_score: total_score,
+            UserGameStats.best_score: case(
+                (UserGameStats.best_score < score, score),
+                else_=UserGameStats.best_score,
+            ),
+            UserGameStats.current_streak: current_streak,
+            UserGameStats.best_streak: case(
+                (UserGameStats.best_streak < current_streak, current_streak),
+                else_=UserGameStats.best_streak,
+            ),
+            UserGameStats.last_played_at: now,
+        }
+
+        if final_stats:
+            values[UserGameStats.custom_stats] = XPService._merge_custom_stats(
+                stats.custom_stats, final_stats
+            )
+
+        statement = (
+            update(UserGameStats)
+            .where(UserGameStats.id == stats.id)
+            .ordered_values(*values.items())
+            .execution_options(synchronize_session=False)
+        )
 
-        db.session.commit()
+        if db.session.get_bind().dialect.update_returning:
+            row = db.session.execute(statement.returning(*values)).one()
+        else:
+            # No UPDATE ... RETURNING (MySQL): read the new values back instead
+            db.session.execute(statement)
+            row = db.session.execute(
+                select(*values).where(UserGameStats.id == stats.id)
+            ).one()
+
+        for key, value in row._mapping.items():
+            set_committed_value(stats, key, value)
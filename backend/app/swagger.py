@@ -1,5 +1,7 @@
+import gzip
+
 from flasgger import Swagger
-from flask import Flask
+from flask import Flask, Response, request
 
 swagger_config = {
     "headers": [],
@@ -41,4 +43,29 @@ swagger_template = {
 
 def init_swagger(app: Flask):
     """Initialize Flasgger with the app"""
-    return Swagger(app, config=swagger_config, template=swagger_template)
+    swagger = Swagger(app, config=swagger_config, template=swagger_template)
+
+    # Routes don't change at runtime, so build the spec once instead of
+    # re-introspecting the whole url map on every /apispec.json hit
+    cached_spec: dict[str, bytes] = {}
+
+    def apispec():
+        if "json" not in cached_spec:
+            # Flask's provider, as flasgger's jsonify used, so dates etc. serialize
+            raw = app.json.dumps(swagger.get_apispecs("apispec")).encode()
+            cached_spec["json"] = raw
+            cached_spec["gzip"] = gzip.compress(raw, compresslevel=9)
+
+        # Respect q-values: "gzip;q=0" means the client refuses gzip
+        if request.accept_encodings["gzip"] > 0:
+            response = Response(cached_spec["gzip"], mimetype="application/json")
+            response.headers["Content-Encoding"] = "gzip"
+        else:
+            response = Response(cached_spec["json"], mimetype="application/json")
+
+        response.vary.add("Accept-Encoding")
+        return response
+
+    app.view_functions["flasgger.apispec"] = apispec
+
+    return swagger
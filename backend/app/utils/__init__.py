@@ -0,0 +1,3 @@
+from .cache import ModelSnapshotCache
+
+__all__ = ["ModelSnapshotCache"]
@@ -0,0 +1,57 @@
+import threading
+
+from typing import Any, Callable, Generic, Hashable, Optional, TypeVar, cast
+
+from cachetools import TTLCache
+from sqlalchemy import event
+
+V = TypeVar("V")
+
+
+class ModelSnapshotCache(Generic[V]):
+    """
+    In-process TTL cache of read-only values derived from one model's rows
+
+    Values must be detached snapshots (tuples, NamedTuples, plain dicts), never
+    ORM instances, since they are shared across requests and threads. Writing
+    any row of `model` drops the whole cache, or only the key returned by
+    `key_of(target)` when given.
+    """
+
+    def __init__(
+        self,
+        model: type,
+        maxsize: int,
+        ttl: float = 300,
+        key_of: Optional[Callable[[Any], Hashable]] = None,
+    ):
+        self._cache: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self._key_of = key_of
+
+        for identifier in ("after_insert", "after_update", "after_delete"):
+            event.listen(model, identifier, self._invalidate)
+
+    def get_or_load(self, key: Hashable, load: Callable[[], V]) -> V:
+        """Return the cached value for `key`, calling `load` on a miss"""
+
+        with self._lock:
+            cached = cast(Optional[V], self._cache.get(key))
+
+        if cached is not None:
+            return cached
+
+        # Loaded outside the lock; concurrent misses may both load, last wins
+        value = load()
+
+        with self._lock:
+            self._cache[key] = value
+
+        return value
+
+    def _invalidate(self, mapper, connection, target) -> None:
+        with self._lock:
+            if self._key_of is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(self._key_of(target), None)